@@ -1,11 +1,16 @@
-# ...existing code...
-from fastapi import FastAPI, Request, Response, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, Request, Response, UploadFile, File, HTTPException, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, List, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from typing import TYPE_CHECKING, Dict, Any
 from dotenv import load_dotenv
+import anyio
+import asyncio
 import os
-from datetime import datetime
+import orjson
+import time
+from contextlib import asynccontextmanager
 
 from utils.auth import (
     create_jwt,
@@ -14,30 +19,79 @@ from utils.auth import (
     clear_auth_cookie,
 )
 from utils.pdf_reader import extract_text_from_pdf, validate_pdf
-from utils.ai_analyzer import ResumeAnalyzer
 from utils.db import SupabaseDB
 
+if TYPE_CHECKING:
+    from utils.ai_analyzer import ResumeAnalyzer
+
 # Load environment variables
 load_dotenv()
 
 # FRONTEND_URL may contain a comma-separated list of allowed origins
 _frontend_env = os.getenv("FRONTEND_URL", "http://localhost:5173")
-FRONTEND_ORIGINS = [o.strip() for o in _frontend_env.split(",") if o.strip()]
+FRONTEND_ORIGINS = tuple(o.strip() for o in _frontend_env.split(",") if o.strip())
+
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # PDF parsing and validation run in the threadpool; raise its default cap of 40
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = int(os.getenv("THREADPOOL_SIZE", 64))
+    await db.connect()
+    yield
+    await db.close()
+
 
-app = FastAPI(title="AI Resume Matcher API", version="1.0.0")
+app = FastAPI(
+    title="AI Resume Matcher API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # Configure CORS: exact origin(s) and credentials required
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[origin.strip() for origin in os.getenv("FRONTEND_URL", "http://localhost:5173").split(",")],
+    allow_origins=FRONTEND_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Analysis and summary payloads are repetitive JSON and compress well
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Initialize services
-analyzer = ResumeAnalyzer()
 db = SupabaseDB()
+_analyzer = None
+_analyzer_lock = asyncio.Lock()
+
+def _create_analyzer() -> "ResumeAnalyzer":
+    from utils.ai_analyzer import ResumeAnalyzer
+    return ResumeAnalyzer()
+
+async def get_analyzer() -> "ResumeAnalyzer":
+    """Create the analyzer on first use so the LLM client stack loads lazily"""
+    global _analyzer
+    if _analyzer is None:
+        async with _analyzer_lock:
+            if _analyzer is None:
+                # Importing langchain/Gemini takes seconds; keep it off the event loop
+                _analyzer = await run_in_threadpool(_create_analyzer)
+    return _analyzer
+
+
+_timestamp_cache = (0, "")
+
+def utc_timestamp() -> str:
+    """Current UTC time as ISO 8601, formatted at most once per second"""
+    global _timestamp_cache
+    now = int(time.time())
+    if _timestamp_cache[0] != now:
+        _timestamp_cache = (now, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now)))
+    return _timestamp_cache[1]
+
 
 @app.get("/")
 async def root():
@@ -52,18 +106,17 @@ async def set_cookie_endpoint(request: Request, response: Response):
     Creates a backend-signed JWT containing minimal user info and sets it as an httpOnly cookie
     so subsequent browser requests will be authenticated by the backend.
     """
-    body = await request.json()
+    body = orjson.loads(await request.body())
     session = body.get("session") or {}
     user = session.get("user") or body.get("user")
 
     if not user or not user.get("id"):
-        return JSONResponse({"detail": "missing user in session"}, status_code=400)
+        return ORJSONResponse({"detail": "missing user in session"}, status_code=400)
 
     # Build payload for backend JWT (minimal info)
     payload = {
         "sub": user.get("id"),
         "email": user.get("email"),
-        "iat": datetime.utcnow().timestamp(),
     }
     token = create_jwt(payload)
     set_auth_cookie(response, token)
@@ -92,23 +145,24 @@ async def get_current_user(user: Dict[str, Any] = Depends(verify_jwt_cookie)):
 async def analyze_resume(
     request: Request,
     file: UploadFile = File(...),
-    user: Dict[str, Any] = Depends(verify_jwt_cookie)
+    user: Dict[str, Any] = Depends(verify_jwt_cookie),
+    analyzer: "ResumeAnalyzer" = Depends(get_analyzer)
 ):
     """Analyze uploaded resume"""
     try:
-        content = await file.read()
-        
-        if len(content) > 10 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="File too large (max 10MB)")
+        # The multipart parser has already spooled the upload (to disk past
+        # 1MB); PDFium reads it from there rather than from a bytes copy.
+        if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+            raise HTTPException(status_code=413, detail="File too large (max 10MB)")
             
-        if not validate_pdf(content):
+        if not await run_in_threadpool(validate_pdf, file.file):
             raise HTTPException(status_code=400, detail="Invalid or unsupported PDF file")
             
-        text = extract_text_from_pdf(content)
-        if not text.strip():
+        text = await run_in_threadpool(extract_text_from_pdf, file.file)
+        if text is None:
             raise HTTPException(status_code=400, detail="No text found in PDF")
             
-        analysis = analyzer.analyze_resume(text)
+        analysis = await analyzer.analyze_resume_async(text)
         
         saved = await db.save_resume_analysis(
             user_id=user["sub"],
@@ -131,12 +185,13 @@ async def analyze_resume(
 @app.post("/chat")
 async def chat_with_ai(
     request: Request,
-    user: Dict[str, Any] = Depends(verify_jwt_cookie)
+    user: Dict[str, Any] = Depends(verify_jwt_cookie),
+    analyzer: "ResumeAnalyzer" = Depends(get_analyzer)
 ):
     """Chat with AI using resume context"""
 
     try:
-        body = await request.json()
+        body = orjson.loads(await request.body())
         message = body.get("message")
 
         if not message:
@@ -150,19 +205,21 @@ async def chat_with_ai(
             raise HTTPException(status_code=404, detail="No resume analysis found")
 
         # Create resume summary for context
-        resume_summary = f"""
-        Summary: {latest_analysis.get('summary_text', '')}
-        Job Roles: {', '.join(latest_analysis.get('job_roles', []) or [])}
-        Skills: {', '.join((latest_analysis.get('soft_skills') or []) + (latest_analysis.get('technical_skills') or []))}
-        Experience Level: {latest_analysis.get('experience_level', '')}
-        """
+        soft_skills = latest_analysis.get("soft_skills") or ()
+        technical_skills = latest_analysis.get("technical_skills") or ()
+        resume_summary = "\n".join((
+            "Summary: " + (latest_analysis.get("summary_text") or ""),
+            "Job Roles: " + ", ".join(latest_analysis.get("job_roles") or ()),
+            "Skills: " + ", ".join((*soft_skills, *technical_skills)),
+            "Experience Level: " + (latest_analysis.get("experience_level") or ""),
+        ))
 
         # Generate AI response
-        response_text = analyzer.chat_with_context(resume_summary, message)
+        response_text = await analyzer.chat_with_context_async(resume_summary, message)
 
         return {
             "reply": response_text,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": utc_timestamp()
         }
 
     except HTTPException:
@@ -173,17 +230,25 @@ async def chat_with_ai(
 
 @app.get("/summaries")
 async def get_summaries(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
     user: Dict[str, Any] = Depends(verify_jwt_cookie)
 ):
-    """Get all resume analyses for the current user"""
+    """Get a page of resume analyses for the current user, newest first"""
 
     try:
         user_id = user.get("sub")
-        analyses = await db.get_user_analyses(user_id)
+        analyses, total = await asyncio.gather(
+            db.get_user_analyses(user_id, limit=limit, offset=offset),
+            db.count_user_analyses(user_id),
+        )
 
         return {
             "summaries": analyses,
-            "count": len(analyses or [])
+            "count": total,
+            "limit": limit,
+            "offset": offset,
+            "has_more": offset + len(analyses) < total
         }
 
     except Exception as e:
@@ -215,7 +280,7 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_timestamp(),
         "services": {
             "database": "connected",
             "ai_analyzer": "ready"
@@ -225,5 +290,16 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)), reload=True)
-# ...existing code...
\ No newline at end of file
+    # "auto" resolves to uvloop/httptools when installed (uvicorn[standard])
+    # and falls back to asyncio/h11 on platforms without them (e.g. Windows).
+    # Size WEB_CONCURRENCY to the number of cores: each worker parses PDFs
+    # on its own GIL.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", 8000)),
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("WEB_CONCURRENCY", 4)),
+        reload=False,
+    )
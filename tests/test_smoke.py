@@ -0,0 +1,117 @@
+import os
+
+# main.py builds the database client at import time; no connection is made
+# because the TestClient below is not entered, so the lifespan never runs.
+os.environ.setdefault("SUPABASE_DB_URL", "postgresql://localhost/test")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from utils.pdf_reader import MIN_TEXT_CHARS
+
+
+def make_pdf(lines):
+    """Build a single-page PDF that draws each line with Helvetica"""
+    ops = ["BT", "/F1 12 Tf", "14 TL", "72 720 Td"]
+    for line in lines:
+        escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        ops.append(f"({escaped}) Tj T*")
+    ops.append("ET")
+    stream = "\n".join(ops).encode()
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+    ]
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+RESUME_LINES = [
+    "Jane Doe - Senior Backend Engineer",
+    "Experience: 7 years building Python and FastAPI services",
+    "Designed PostgreSQL schemas and tuned slow queries for reporting",
+    "Skills: Python, FastAPI, PostgreSQL, Docker, Kubernetes, AWS",
+    "Education: B.Sc. Computer Science",
+]
+
+
+class StubAnalyzer:
+    async def analyze_resume_async(self, text):
+        return {"summary": text.splitlines()[0], "skills": ["Python"], "score": 80}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    saved = {}
+
+    async def save_resume_analysis(user_id, resume_title, analysis):
+        saved.update(user_id=user_id, resume_title=resume_title, **analysis)
+        return saved
+
+    monkeypatch.setattr(main.db, "save_resume_analysis", save_resume_analysis)
+    main.app.dependency_overrides[main.get_analyzer] = StubAnalyzer
+
+    # The auth cookie is Secure by default, so talk to the app over https
+    client = TestClient(main.app, base_url="https://testserver")
+    response = client.post("/set-cookie", json={"session": {"user": {"id": "user-1", "email": "jane@example.com"}}})
+    assert response.status_code == 200
+    yield client
+
+    main.app.dependency_overrides.clear()
+
+
+def upload(client, content, filename="resume.pdf"):
+    return client.post("/analyze-resume", files={"file": (filename, content, "application/pdf")})
+
+
+def test_analyze_resume_valid_pdf(client):
+    pdf = make_pdf(RESUME_LINES)
+    assert sum(map(len, RESUME_LINES)) >= MIN_TEXT_CHARS
+
+    response = upload(client, pdf)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["message"] == "Analysis completed"
+    assert body["analysis"]["user_id"] == "user-1"
+    assert body["analysis"]["resume_title"] == "resume.pdf"
+    assert body["analysis"]["summary"] == RESUME_LINES[0]
+
+
+def test_analyze_resume_rejects_non_pdf(client):
+    response = upload(client, b"this is not a pdf", filename="resume.txt")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid or unsupported PDF file"
+
+
+def test_analyze_resume_rejects_pdf_without_enough_text(client):
+    response = upload(client, make_pdf(["Too short"]))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No text found in PDF"
+
+
+def test_analyze_resume_rejects_large_upload(client):
+    pdf = make_pdf(RESUME_LINES)
+    oversized = pdf + b"\0" * (main.MAX_UPLOAD_SIZE + 1 - len(pdf))
+
+    response = upload(client, oversized)
+
+    assert response.status_code == 413
@@ -1,10 +1,53 @@
 from typing import Dict, List, Any
+import asyncio
+import hashlib
 import os
+from cachetools import TTLCache
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.messages import SystemMessage, HumanMessage
-import json
+import orjson
 import re
 
+# Keywords picked out of free-text replies when the model returns no JSON
+_SKILL_NAMES = {
+    "python": "Python",
+    "javascript": "JavaScript",
+    "leadership": "Leadership",
+    "communication": "Communication",
+}
+_SKILL_RE = re.compile("|".join(_SKILL_NAMES), re.IGNORECASE)
+
+ANALYZE_PROMPT = """You are an expert resume analyzer and career advisor.
+Analyze the following resume text and provide structured insights in JSON format.
+
+Return a JSON object with these fields:
+{
+    "summary": "A concise 2-3 sentence summary of the candidate's experience and key strengths",
+    "job_roles": ["List of 3-5 suggested job roles that match the candidate's experience"],
+    "soft_skills": ["List of 5-7 key soft skills demonstrated in the resume"],
+    "technical_skills": ["List of technical skills and technologies mentioned"],
+    "sentiment": "Overall sentiment of the resume (Positive/Neutral/Needs Improvement)",
+    "tone": "Professional tone assessment (Formal/Conversational/Mixed)",
+    "suggested_jobs": ["List of 3-5 specific job titles the candidate should apply for"],
+    "improvement_areas": ["List of 2-3 areas where the resume could be improved"],
+    "experience_level": "Estimated experience level (Entry/Mid/Senior/Executive)"
+}
+
+Be specific, professional, and constructive in your analysis.
+Focus on extracting real, meaningful information from the resume text provided.
+If certain information is not available in the resume, provide reasonable defaults based on context."""
+
+CHAT_PROMPT = """You are a friendly and knowledgeable AI career assistant.
+You have access to the user's resume summary and should provide helpful,
+personalized career advice and insights.
+
+Resume Context:
+{resume_summary}
+
+Be encouraging, specific, and provide actionable advice when possible.
+Keep responses concise but informative. Focus on providing genuine career guidance
+based on the user's actual resume content and question."""
+
 class ResumeAnalyzer:
     def __init__(self):
         self.api_key = os.getenv("GOOGLE_API_KEY")
@@ -17,73 +60,84 @@ class ResumeAnalyzer:
             temperature=0.3,
             max_output_tokens=2048
         )
+        self._analyze_system = SystemMessage(content=ANALYZE_PROMPT)
+        # Caps concurrent upstream Gemini calls made through the async methods
+        self._sem = asyncio.Semaphore(int(os.getenv("GEMINI_CONCURRENCY", 8)))
+        # Analyses keyed by a hash of the resume text, so re-uploads skip Gemini
+        self._analysis_cache = TTLCache(
+            maxsize=1024,
+            ttl=int(os.getenv("ANALYSIS_CACHE_TTL", 24 * 60 * 60))
+        )
     
     def analyze_resume(self, resume_text: str) -> Dict[str, Any]:
         """Analyze resume text using Google Gemini"""
         
-        system_prompt = """You are an expert resume analyzer and career advisor. 
-        Analyze the following resume text and provide structured insights in JSON format.
+        try:
+            response = self.llm.invoke(self._analysis_messages(resume_text))
+            return self._parse_analysis(response.content)
+        except Exception as e:
+            raise ValueError(f"Error analyzing resume: {str(e)}")
+    
+    async def analyze_resume_async(self, resume_text: str) -> Dict[str, Any]:
+        """Analyze resume text using Google Gemini without blocking the event loop"""
         
-        Return a JSON object with these fields:
-        {
-            "summary": "A concise 2-3 sentence summary of the candidate's experience and key strengths",
-            "job_roles": ["List of 3-5 suggested job roles that match the candidate's experience"],
-            "soft_skills": ["List of 5-7 key soft skills demonstrated in the resume"],
-            "technical_skills": ["List of technical skills and technologies mentioned"],
-            "sentiment": "Overall sentiment of the resume (Positive/Neutral/Needs Improvement)",
-            "tone": "Professional tone assessment (Formal/Conversational/Mixed)",
-            "suggested_jobs": ["List of 3-5 specific job titles the candidate should apply for"],
-            "improvement_areas": ["List of 2-3 areas where the resume could be improved"],
-            "experience_level": "Estimated experience level (Entry/Mid/Senior/Executive)"
-        }
+        key = hashlib.blake2b(resume_text.encode(), digest_size=16).hexdigest()
+        cached = self._analysis_cache.get(key)
+        if cached is not None:
+            return dict(cached)
         
-        Be specific, professional, and constructive in your analysis.
-        Focus on extracting real, meaningful information from the resume text provided.
-        If certain information is not available in the resume, provide reasonable defaults based on context."""
+        try:
+            async with self._sem:
+                response = await self.llm.ainvoke(self._analysis_messages(resume_text))
+            analysis = self._parse_analysis(response.content)
+        except Exception as e:
+            raise ValueError(f"Error analyzing resume: {str(e)}")
+        
+        self._analysis_cache[key] = dict(analysis)
+        return analysis
+    
+    def _analysis_messages(self, resume_text: str) -> List[Any]:
+        """Build the prompt messages for a resume analysis"""
         
-        messages = [
-            SystemMessage(content=system_prompt),
+        return [
+            self._analyze_system,
             HumanMessage(content=f"Please analyze this resume:\n\n{resume_text}")
         ]
+    
+    def _parse_analysis(self, content: str) -> Dict[str, Any]:
+        """Parse the model's analysis reply, falling back to a structured default"""
         
+        # Try to parse JSON from the response
         try:
-            response = self.llm.invoke(messages)
-            content = response.content
-            
-            # Try to parse JSON from the response
-            try:
-                json_match = re.search(r'\{[\s\S]*\}', content)
-                if json_match:
-                    json_str = json_match.group()
-                    analysis = json.loads(json_str)
-                    
-                    # check all required fields are present with defaults
-                    defaults = {
-                        "summary": "Professional with diverse skills and experience.",
-                        "job_roles": ["Software Engineer", "Project Manager", "Data Analyst"],
-                        "soft_skills": ["Communication", "Teamwork", "Problem-solving", "Leadership"],
-                        "technical_skills": ["Various technologies"],
-                        "sentiment": "Positive",
-                        "tone": "Professional",
-                        "suggested_jobs": ["Software Developer", "Technical Lead"],
-                        "improvement_areas": ["Add more specific achievements", "Include quantifiable results"],
-                        "experience_level": "Mid"
-                    }
-                    
-                  
-                    for key, default_value in defaults.items():
-                        if key not in analysis or not analysis[key]:
-                            analysis[key] = default_value
-                    
-                    return analysis
-                else:
-                    return self._create_structured_response(content)
-                    
-            except json.JSONDecodeError:
+            start = content.find('{')
+            end = content.rfind('}')
+            if start != -1 and end > start:
+                analysis = orjson.loads(content[start:end + 1])
+                
+                # check all required fields are present with defaults
+                defaults = {
+                    "summary": "Professional with diverse skills and experience.",
+                    "job_roles": ["Software Engineer", "Project Manager", "Data Analyst"],
+                    "soft_skills": ["Communication", "Teamwork", "Problem-solving", "Leadership"],
+                    "technical_skills": ["Various technologies"],
+                    "sentiment": "Positive",
+                    "tone": "Professional",
+                    "suggested_jobs": ["Software Developer", "Technical Lead"],
+                    "improvement_areas": ["Add more specific achievements", "Include quantifiable results"],
+                    "experience_level": "Mid"
+                }
+                
+              
+                for key, default_value in defaults.items():
+                    if key not in analysis or not analysis[key]:
+                        analysis[key] = default_value
+                
+                return analysis
+            else:
                 return self._create_structured_response(content)
                 
-        except Exception as e:
-            raise ValueError(f"Error analyzing resume: {str(e)}")
+        except orjson.JSONDecodeError:
+            return self._create_structured_response(content)
     
     def _create_structured_response(self, text: str) -> Dict[str, Any]:
         """Create a structured response when JSON parsing fails"""
@@ -91,15 +145,8 @@ class ResumeAnalyzer:
         # Extract key information from the text response
         # Simple keyword extraction for demonstration
         
-        skills = []
-        if "python" in text.lower():
-            skills.append("Python")
-        if "javascript" in text.lower():
-            skills.append("JavaScript")
-        if "leadership" in text.lower():
-            skills.append("Leadership")
-        if "communication" in text.lower():
-            skills.append("Communication")
+        found = {m.group().lower() for m in _SKILL_RE.finditer(text)}
+        skills = [name for key, name in _SKILL_NAMES.items() if key in found]
             
         return {
             "summary": text.split('.')[0] + "." if '.' in text else "Experienced professional with diverse background.",
@@ -116,24 +163,26 @@ class ResumeAnalyzer:
     def chat_with_context(self, resume_summary: str, user_message: str) -> str:
         """Generate chat response using resume context"""
         
-        system_prompt = f"""You are a friendly and knowledgeable AI career assistant. 
-        You have access to the user's resume summary and should provide helpful, 
-        personalized career advice and insights.
-        
-        Resume Context:
-        {resume_summary}
-        
-        Be encouraging, specific, and provide actionable advice when possible.
-        Keep responses concise but informative. Focus on providing genuine career guidance
-        based on the user's actual resume content and question."""
-        
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_message)
-        ]
+        try:
+            response = self.llm.invoke(self._chat_messages(resume_summary, user_message))
+            return response.content
+        except Exception as e:
+            return "I apologize, but I'm having trouble processing your request right now. Please try again later."
+    
+    async def chat_with_context_async(self, resume_summary: str, user_message: str) -> str:
+        """Generate chat response using resume context without blocking the event loop"""
         
         try:
-            response = self.llm.invoke(messages)
+            async with self._sem:
+                response = await self.llm.ainvoke(self._chat_messages(resume_summary, user_message))
             return response.content
         except Exception as e:
-            return "I apologize, but I'm having trouble processing your request right now. Please try again later."
\ No newline at end of file
+            return "I apologize, but I'm having trouble processing your request right now. Please try again later."
+    
+    def _chat_messages(self, resume_summary: str, user_message: str) -> List[Any]:
+        """Build the prompt messages for a chat turn"""
+        
+        return [
+            SystemMessage(content=CHAT_PROMPT.format(resume_summary=resume_summary)),
+            HumanMessage(content=user_message)
+        ]
\ No newline at end of file
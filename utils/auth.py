@@ -1,26 +1,48 @@
+import hashlib
 import os
-from datetime import datetime, timedelta
+import threading
+import time
 from typing import Dict, Any
 import jwt
+from cachetools import TTLCache
 from fastapi import Request, HTTPException, Response
 
 JWT_SECRET = os.getenv("JWT_SECRET", "change-me-in-prod")
 JWT_ALGO = "HS256"
+# Key material resolved once at import rather than on every encode/decode
+_SIGNING_KEY = JWT_SECRET.encode()
+
+# Recently verified claims keyed by SHA-256 of the token (never the token itself).
+# verify_jwt_cookie runs in the threadpool, so access is guarded by a lock.
+_verified_tokens = TTLCache(maxsize=10_000, ttl=5)
+_verified_tokens_lock = threading.Lock()
 
 def create_jwt(payload: dict, expires_in_days: int = 7) -> str:
-    payload = payload.copy()
-    payload["exp"] = datetime.utcnow() + timedelta(days=expires_in_days)
-    payload["iat"] = datetime.utcnow()
-    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGO)
+    now = int(time.time())
+    claims = {**payload, "iat": now, "exp": now + expires_in_days * 24 * 60 * 60}
+    token = jwt.encode(claims, _SIGNING_KEY, algorithm=JWT_ALGO)
     # PyJWT returns str for >=2.x
     return token
 
 def verify_jwt_cookie(request: Request) -> Dict[str, Any]:
+    # Reuse the payload if this request has already been verified
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
+    key = hashlib.sha256(token.encode()).digest()
+    with _verified_tokens_lock:
+        payload = _verified_tokens.get(key)
+    if payload is not None and payload.get("exp", 0) > time.time():
+        request.state.user = payload
+        return payload
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGO])
+        payload = jwt.decode(token, _SIGNING_KEY, algorithms=[JWT_ALGO])
+        with _verified_tokens_lock:
+            _verified_tokens[key] = payload
+        request.state.user = payload
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
@@ -1,24 +1,66 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+import orjson
 import os
-from supabase import create_client, Client
-import uuid
-from datetime import datetime
+import asyncpg
+from cachetools import TTLCache
+
+INSERT_ANALYSIS_SQL = """
+INSERT INTO resume_analysis (
+    user_id, resume_title, summary_text, job_roles, soft_skills,
+    technical_skills, sentiment, tone, suggested_jobs, improvement_areas,
+    experience_level
+) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+RETURNING id, created_at
+"""
+
+def _jsonb_encode(value: Any) -> str:
+    return orjson.dumps(value).decode()
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Decode and encode JSONB columns as Python lists/dicts with orjson"""
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=_jsonb_encode,
+        decoder=orjson.loads,
+        schema="pg_catalog"
+    )
 
 class SupabaseDB:
     def __init__(self):
-        self.supabase_url = os.getenv("SUPABASE_URL")
-        self.supabase_key = os.getenv("SUPABASE_SERVICE_KEY")
+        # Postgres connection string from the Supabase dashboard. Use the direct
+        # or session-pooler URL: the transaction pooler rejects prepared statements.
+        self.database_url = os.getenv("SUPABASE_DB_URL")
         
-        if not self.supabase_url or not self.supabase_key:
-            raise ValueError("Supabase URL and Service Key are required")
+        if not self.database_url:
+            raise ValueError("Supabase database URL (SUPABASE_DB_URL) is required")
         
-        self.client: Client = create_client(self.supabase_url, self.supabase_key)
+        self.pool: Optional[asyncpg.Pool] = None
+        # Latest analysis per user for the /chat hot path; dropped on save/delete
+        self._latest_cache = TTLCache(
+            maxsize=10_000,
+            ttl=int(os.getenv("LATEST_ANALYSIS_CACHE_TTL", 60))
+        )
     
-    async def save_resume_analysis(self, user_id: str, resume_title: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
-        """Save resume analysis to database"""
+    async def connect(self):
+        """Open the connection pool for this worker"""
+        self.pool = await asyncpg.create_pool(
+            self.database_url,
+            min_size=int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            max_size=int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            max_inactive_connection_lifetime=300,
+            init=_init_connection
+        )
+    
+    async def close(self):
+        """Close pooled connections"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+    
+    def _analysis_row(self, user_id: str, resume_title: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a resume_analysis row in INSERT_ANALYSIS_SQL's column order"""
         
-        data = {
-            "id": str(uuid.uuid4()),
+        return {
             "user_id": user_id,
             "resume_title": resume_title,
             "summary_text": analysis.get("summary", ""),
@@ -29,36 +71,82 @@ class SupabaseDB:
             "tone": analysis.get("tone", ""),
             "suggested_jobs": analysis.get("suggested_jobs", []),
             "improvement_areas": analysis.get("improvement_areas", []),
-            "experience_level": analysis.get("experience_level", ""),
-            "created_at": datetime.utcnow().isoformat()
+            "experience_level": analysis.get("experience_level", "")
         }
+    
+    async def save_resume_analysis(self, user_id: str, resume_title: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Save resume analysis to database"""
+        
+        data = self._analysis_row(user_id, resume_title, analysis)
         
         try:
-            response = self.client.table("resume_analysis").insert(data).execute()
+            # id and created_at come from the column defaults
+            data.update(await self.pool.fetchrow(INSERT_ANALYSIS_SQL, *data.values()))
+            self._latest_cache.pop(user_id, None)
             return data
         except Exception as e:
             raise ValueError(f"Error saving analysis: {str(e)}")
     
-    async def get_user_analyses(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get all resume analyses for a user"""
+    async def save_resume_analyses_bulk(self, analyses: List[Tuple[str, str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Save several (user_id, resume_title, analysis) entries in one round trip"""
+        
+        rows = [self._analysis_row(*entry) for entry in analyses]
+        
+        try:
+            # fetchmany reuses one prepared statement and runs in one transaction,
+            # so DEFAULT NOW() gives every row in the batch the same timestamp
+            records = await self.pool.fetchmany(INSERT_ANALYSIS_SQL, [tuple(row.values()) for row in rows])
+            for row, record in zip(rows, records):
+                row.update(record)
+                self._latest_cache.pop(row["user_id"], None)
+            return rows
+        except Exception as e:
+            raise ValueError(f"Error saving analyses: {str(e)}")
+    
+    async def get_user_analyses(self, user_id: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Get a page of resume analyses for a user, newest first"""
         
         try:
-            response = self.client.table("resume_analysis")\
-                .select("*")\
-                .eq("user_id", user_id)\
-                .order("created_at", desc=True)\
-                .execute()
+            rows = await self.pool.fetch(
+                "SELECT * FROM resume_analysis WHERE user_id = $1 "
+                "ORDER BY created_at DESC LIMIT $2 OFFSET $3",
+                user_id,
+                limit,
+                offset
+            )
             
-            return response.data if response.data else []
+            return [dict(row) for row in rows]
         except Exception as e:
             raise ValueError(f"Error fetching analyses: {str(e)}")
     
+    async def count_user_analyses(self, user_id: str) -> int:
+        """Count all resume analyses for a user"""
+        
+        try:
+            return await self.pool.fetchval(
+                "SELECT count(*) FROM resume_analysis WHERE user_id = $1",
+                user_id
+            )
+        except Exception as e:
+            raise ValueError(f"Error counting analyses: {str(e)}")
+    
     async def get_latest_analysis(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get the most recent analysis for a user"""
         
+        cached = self._latest_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
         try:
-            analyses = await self.get_user_analyses(user_id)
-            return analyses[0] if analyses else None
+            row = await self.pool.fetchrow(
+                "SELECT * FROM resume_analysis WHERE user_id = $1 ORDER BY created_at DESC LIMIT 1",
+                user_id
+            )
+            if row is None:
+                return None
+            latest = dict(row)
+            self._latest_cache[user_id] = latest
+            return latest
         except Exception as e:
             raise ValueError(f"Error fetching latest analysis: {str(e)}")
     
@@ -66,13 +154,14 @@ class SupabaseDB:
         """Delete a specific analysis"""
         
         try:
-            response = self.client.table("resume_analysis")\
-                .delete()\
-                .eq("id", analysis_id)\
-                .eq("user_id", user_id)\
-                .execute()
+            status = await self.pool.execute(
+                "DELETE FROM resume_analysis WHERE id = $1 AND user_id = $2",
+                analysis_id,
+                user_id
+            )
             
-            return len(response.data) > 0
+            self._latest_cache.pop(user_id, None)
+            return status != "DELETE 0"
         except Exception as e:
             raise ValueError(f"Error deleting analysis: {str(e)}")
     
@@ -101,6 +190,9 @@ class SupabaseDB:
         
         CREATE INDEX IF NOT EXISTS idx_resume_analysis_created_at 
         ON resume_analysis(created_at DESC);
+        
+        CREATE INDEX IF NOT EXISTS idx_resume_analysis_user_id_created_at 
+        ON resume_analysis(user_id, created_at DESC);
         """
         
         # Note: This SQL should be executed in Supabase SQL editor
@@ -1,41 +1,128 @@
+import hashlib
 import io
-from typing import Optional
-from PyPDF2 import PdfReader
+import os
+import threading
+from typing import BinaryIO, Optional, Tuple, Union
+from cachetools import TTLCache
+import pypdfium2 as pdfium
 
-def validate_pdf(file_content: bytes) -> bool:
-    """Validate PDF content"""
+# In-memory bytes, a filesystem path, or a seekable binary file such as
+# UploadFile.file. Paths and files are read by PDFium on demand instead of
+# being loaded into the Python heap.
+PdfSource = Union[bytes, str, BinaryIO]
+
+# Below this much text a PDF is treated as image-only/scanned and not analyzed
+MIN_TEXT_CHARS = 200
+
+# PDFium is not thread-safe, and extraction runs in the threadpool
+_pdfium_lock = threading.Lock()
+
+# Extracted text keyed by a hash of the PDF, so re-uploads skip parsing.
+# Built on first use so PDF_TEXT_CACHE_TTL can come from .env, which main.py
+# loads after importing this module.
+_text_cache: Optional[TTLCache] = None
+_text_cache_lock = threading.Lock()
+
+def _get_text_cache() -> TTLCache:
+    """Return the text cache, creating it on first use; call with _text_cache_lock held"""
+    global _text_cache
+    if _text_cache is None:
+        _text_cache = TTLCache(maxsize=256, ttl=int(os.getenv("PDF_TEXT_CACHE_TTL", 24 * 60 * 60)))
+    return _text_cache
+
+def _head_and_tail(source: PdfSource) -> Tuple[bytes, bytes]:
+    """Return buffers holding the start and the last 1 KiB of a PDF source"""
+    if isinstance(source, bytes):
+        # Searched in place by the caller, so no slices are taken
+        return source, source
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return _head_and_tail(f)
+    source.seek(0)
+    head = source.read(8)
+    source.seek(max(source.seek(0, io.SEEK_END) - 1024, 0))
+    tail = source.read()
+    source.seek(0)
+    return head, tail
+
+def _digest(source: PdfSource) -> bytes:
+    """BLAKE2b digest of a PDF source's bytes"""
+    if isinstance(source, bytes):
+        return hashlib.blake2b(source, digest_size=16).digest()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return _digest(f)
+    source.seek(0)
+    digest = hashlib.file_digest(source, lambda: hashlib.blake2b(digest_size=16)).digest()
+    source.seek(0)
+    return digest
+
+def validate_pdf(source: PdfSource) -> bool:
+    """Cheap PDF check (header and trailer); full parsing is left to extraction"""
     try:
-        # Basic PDF signature check
-        if len(file_content) < 4:
+        head, tail = _head_and_tail(source)
+        
+        # Basic PDF signature check ("%PDF-1.x" / "%PDF-2.0"), without slicing
+        if not head.startswith(b'%PDF-'):
             return False
             
-        # Check for %PDF header (case insensitive)
-        header = file_content[0:4].lower()
-        if not header.startswith(b'%pdf'):
+        # A complete PDF ends with an %%EOF marker near the end of the file
+        if tail.rfind(b'%%EOF', -1024) == -1:
             return False
             
-        # Attempt to parse with PdfReader
-        pdf_file = io.BytesIO(file_content)
-        reader = PdfReader(pdf_file)
-        return len(reader.pages) > 0
+        # The document itself is opened once, by extract_text_from_pdf, which
+        # reports unreadable files as None
+        return True
     except:
         return False
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF content"""
-    try:
-        pdf_file = io.BytesIO(file_content)
-        reader = PdfReader(pdf_file)
-        
-        text_parts = []
-        for page in reader.pages:
-            try:
-                page_text = page.extract_text() or ""
-                if page_text.strip():
-                    text_parts.append(page_text)
-            except:
-                continue
-                
-        return "\n".join(text_parts).strip()
-    except Exception as e:
-        raise ValueError(f"Failed to extract PDF text: {str(e)}")
\ No newline at end of file
+def extract_text_from_pdf(source: PdfSource) -> Optional[str]:
+    """Extract text from PDF content; None if unreadable or under MIN_TEXT_CHARS"""
+    key = _digest(source)
+    with _text_cache_lock:
+        text = _get_text_cache().get(key)
+    if text is not None:
+        return text
+    
+    text = _extract_text(source)
+    if text is not None:
+        with _text_cache_lock:
+            _get_text_cache()[key] = text
+    return text
+
+def _extract_text(source: PdfSource) -> Optional[str]:
+    """Run PDFium text extraction over every page"""
+    with _pdfium_lock:
+        try:
+            if not isinstance(source, (bytes, str)):
+                source.seek(0)
+            pdf = pdfium.PdfDocument(source)
+        except Exception as e:
+            print(f"PDF extraction error: {str(e)}")  # Log server-side
+            return None
+
+        try:
+            # Pages are read serially: PDFium calls cannot overlap across threads,
+            # so parallelism comes from running several workers instead
+            text_parts = []
+            total_len = 0
+            for page in pdf:
+                textpage = None
+                try:
+                    textpage = page.get_textpage()
+                    page_text = textpage.get_text_range()
+                    if page_text and not page_text.isspace():
+                        text_parts.append(page_text)
+                        total_len += len(page_text)
+                except:
+                    continue
+                finally:
+                    if textpage is not None:
+                        textpage.close()
+                    page.close()
+
+            if total_len < MIN_TEXT_CHARS:
+                return None
+            return "\n".join(text_parts).strip()
+        finally:
+            pdf.close()
\ No newline at end of file